@@ -1,10 +1,9 @@
 import uuid
 import random
-import math
 from enum import Enum
 from typing import Tuple
 from protocols.scheduler import BeaconScheduler
-from protocols.beacon import Beacon
+from protocols.beacon import Beacon, INT_ID_MASK
 from core.events import EventType
 from config.config_handler import ConfigHandler
 from utils import logging
@@ -28,6 +27,7 @@ class Buoy:
         cfg = ConfigHandler()
         
         self.id = uuid.uuid4()
+        self.int_id = self.id.int & INT_ID_MASK
         self.position = position
         self.is_mobile = is_mobile
         self.battery = battery if battery is not None else cfg.get('buoys', 'default_battery')
@@ -38,6 +38,7 @@ class Buoy:
         self.state = BuoyState.RECEIVING
         self.metrics = metrics
         self.simulator = None
+        self.position_view = None  # this buoy's row in Simulator.positions, set by the simulator
 
         self.difs_time = cfg.get('csma', 'difs_time')
         self.slot_time = cfg.get('csma', 'slot_time')
@@ -64,9 +65,8 @@ class Buoy:
         
         # Multihop forwarded mode: track seen beacons to avoid forwarding duplicates
         self.forwarded_beacons = set()
-        
-    def handle_event(self, event, sim_time: float):
-        handlers = {
+
+        self.handlers = {
             EventType.SCHEDULER_CHECK: self._handle_scheduler_check,
             EventType.CHANNEL_SENSE: self._handle_channel_sense,
             EventType.DIFS_COMPLETION: self._handle_difs_completion,
@@ -77,11 +77,12 @@ class Buoy:
             EventType.BUOY_MOVEMENT: self._handle_buoy_movement
         }
         
-        handler = handlers.get(event.event_type)
+    def handle_event(self, event, sim_time: float):
+        handler = self.handlers.get(event.event_type)
         if handler:
             handler(event, sim_time)
         else:
-            logging.log_error(f"Buoy {str(self.id)[:6]} received unhandled event: {event.event_type}")
+            logging.log_error("Buoy %.6s received unhandled event: %s", self.id, event.event_type.name)
 
     def _handle_scheduler_check(self, event, sim_time: float):
         should_send = self.scheduler.should_send(
@@ -114,7 +115,7 @@ class Buoy:
                 # Create and broadcast forwarded beacon
                 forwarded = self.forward_beacon(forward_beacon, sim_time)
                 self.channel.broadcast(forwarded, sim_time)
-                logging.log_info(f"Buoy {str(self.id)[:6]} forwarded beacon from {str(forward_beacon.origin_id)[:6]}, hops left: {forwarded.hop_limit}")
+                logging.log_info("Buoy %.6s forwarded beacon from %.6s, hops left: %d", self.id, forward_beacon.origin_id, forwarded.hop_limit)
         elif self.want_to_send:
             # Normal transmission
             if self.channel.is_busy(self.position, sim_time):
@@ -196,36 +197,7 @@ class Buoy:
         if not beacon:
             return
     
-        collision = False
-        collision_checked = event.data.get("collision_checked", False)
-    
-        if not collision_checked:
-            COLLISION_WINDOW = 1e-5
-            
-            for tx_beacon, start, end, _, _ in self.channel.active_transmissions:
-                if tx_beacon.sender_id == beacon.sender_id and tx_beacon.timestamp == beacon.timestamp:
-                    continue
-            
-                if sim_time < start:
-                    continue
-                
-                dx = self.position[0] - tx_beacon.position[0]
-                dy = self.position[1] - tx_beacon.position[1]
-                distance = math.hypot(dx, dy)
-            
-                if distance > self.comm_range_max:
-                    continue
-                
-                propagation_delay = distance / self.speed_of_light
-                arrival_time = end + propagation_delay
-            
-                if abs(arrival_time - sim_time) < COLLISION_WINDOW:
-                    logging.log_error(f"Collision detected at receiver {str(self.id)[:6]} between {str(beacon.sender_id)[:6]} and {str(tx_beacon.sender_id)[:6]}")
-                    collision = True
-                    break
-    
-        if collision:
-            return
+        # Collisions were already resolved by the channel when it scheduled this reception
         
         # Track all unique nodes discovered from this beacon (for metrics)
         discovered_nodes = set()
@@ -285,14 +257,12 @@ class Buoy:
                     {"forward_beacon": beacon}
                 )
         
-        key = (self.id, beacon.sender_id, beacon.timestamp)
-        if key not in self.channel.seen_attempts:
-            self.channel.seen_attempts.add(key)
+        key = (self.int_id, beacon.sender_int, beacon.timestamp)
+        if self.channel.first_attempt(key):
         
-            for i, (tx_beacon, start, end, potential_count, processed_count) in enumerate(self.channel.active_transmissions):
-                if tx_beacon.sender_id == beacon.sender_id and tx_beacon.timestamp == beacon.timestamp:
-                    self.channel.active_transmissions[i] = (tx_beacon, start, end, potential_count, processed_count + 1)
-                    break
+            transmission = event.data.get("transmission")
+            if transmission:
+                transmission.processed += 1
         
             if self.metrics:
                 # Track all unique nodes discovered from this beacon
@@ -347,6 +317,9 @@ class Buoy:
             
         vx, vy = self.velocity
         self.position = (x + vx * dt, y + vy * dt)
+        self.channel.move_buoy(self, (x, y))
+        if self.position_view is not None:
+            self.position_view[:] = self.position
         
         self.simulator.schedule_event(
             sim_time + dt, EventType.BUOY_MOVEMENT, self
@@ -1,11 +1,29 @@
+import bisect
 import math
 import random
+from collections import OrderedDict
+from dataclasses import dataclass
+from operator import attrgetter
 from typing import Tuple
 from protocols.beacon import Beacon
 from core.events import EventType
 from config.config_handler import ConfigHandler
 from utils import logging
 
+@dataclass(slots=True, eq=False)
+class Transmission:
+    beacon: Beacon
+    start: float
+    end: float
+    potential: int  # receivers in range when sent
+    processed: int = 0  # receivers that actually got it
+
+# Dedup keys kept before the oldest is evicted; repeats of a beacon arrive well within this window
+SEEN_ATTEMPTS_MAX = 10000
+
+# active_transmissions is kept sorted by end time so overlap scans can skip finished ones
+_tx_end = attrgetter('end')
+
 class Channel:
     def __init__(self, metrics = None, ideal_channel = None):
         cfg = ConfigHandler()
@@ -13,8 +31,9 @@ class Channel:
         self.active_transmissions = []
         self.metrics = metrics
         self.buoys = []
+        self.grid = {}  # (cx, cy) -> buoys in that cell
         self.simulator = None
-        self.seen_attempts = set()
+        self.seen_attempts = OrderedDict()  # bounded, oldest first
         self.collision_beacons = set()
         
         self.ideal_channel = ideal_channel if ideal_channel is not None else cfg.get('simulation', 'ideal_channel')
@@ -24,53 +43,96 @@ class Channel:
         self.comm_range_high_prob = cfg.get('network', 'communication_range_high_prob')
         self.delivery_prob_high = cfg.get('network', 'delivery_prob_high')
         self.delivery_prob_low = cfg.get('network', 'delivery_prob_low')
+        
+        # Range checks compare squared distances to skip the sqrt
+        self.comm_range_max_sq = self.comm_range_max ** 2
+        self.comm_range_high_prob_sq = self.comm_range_high_prob ** 2
+        
+        # A transmission can still be arriving for up to the max propagation delay after it ends
+        self.grace_period = self.comm_range_max / self.speed_of_light + 1e-6
+        
+        # Grid cells are one max range wide, so anything in range sits in the surrounding 3x3 block
+        self.cell_size = self.comm_range_max
+
+        self.handlers = {
+            EventType.TRANSMISSION_END: self._handle_transmission_end,
+            EventType.TRANSMISSION_EXPIRE: self._handle_transmission_expire
+        }
 
     def set_buoys(self, buoys):
         self.buoys = buoys
+        self.grid = {}
+        for buoy in buoys:
+            self.grid.setdefault(self._cell(buoy.position), []).append(buoy)
+
+    def _cell(self, position: Tuple[float, float]) -> Tuple[int, int]:
+        return (int(position[0] // self.cell_size), int(position[1] // self.cell_size))
+
+    def move_buoy(self, buoy, old_position: Tuple[float, float]):
+        old_cell = self._cell(old_position)
+        new_cell = self._cell(buoy.position)
+        if old_cell == new_cell:
+            return
+        # Inactive buoys keep moving but are not indexed
+        cell_buoys = self.grid.get(old_cell)
+        if not cell_buoys or buoy not in cell_buoys:
+            return
+        cell_buoys.remove(buoy)
+        if not cell_buoys:
+            del self.grid[old_cell]
+        self.grid.setdefault(new_cell, []).append(buoy)
+
+    def buoys_near(self, position: Tuple[float, float]):
+        cx, cy = self._cell(position)
+        grid = self.grid
+        nearby = []
+        for x in (cx - 1, cx, cx + 1):
+            for y in (cy - 1, cy, cy + 1):
+                cell_buoys = grid.get((x, y))
+                if cell_buoys:
+                    nearby.extend(cell_buoys)
+        return nearby
+
+    def first_attempt(self, key) -> bool:
+        # True the first time a (receiver, sender, timestamp) key is seen
+        seen = self.seen_attempts
+        if key in seen:
+            return False
+        seen[key] = None
+        if len(seen) > SEEN_ATTEMPTS_MAX:
+            seen.popitem(last=False)
+        return True
 
     def handle_event(self, event, sim_time: float):
-        if event.event_type == EventType.CHANNEL_UPDATE:
-            self._handle_channel_update(event, sim_time)
-        elif event.event_type == EventType.TRANSMISSION_END:
-            self._handle_transmission_end(event, sim_time)
+        handler = self.handlers.get(event.event_type)
+        if handler:
+            handler(event, sim_time)
         else:
-            logging.log_error(f"Channel received unhandled event: {event.event_type}")
-
-    def _handle_channel_update(self, event, sim_time: float):
-        self.update(sim_time)
-        self.simulator.schedule_event(
-            sim_time + 1.0, EventType.CHANNEL_UPDATE, self
-        )
+            logging.log_error("Channel received unhandled event: %s", event.event_type.name)
 
     def _handle_transmission_end(self, event, sim_time: float):
         beacon = event.data.get("beacon")
         if beacon:
-            logging.log_info(f"Transmission completed for beacon from {str(beacon.sender_id)[:6]}")
+            logging.log_info("Transmission completed for beacon from %.6s", beacon.sender_id)
 
-    def update(self, sim_time: float):
-        expired_indices = []
-        max_delay = self.comm_range_max / self.speed_of_light
-        grace_period = max_delay + 1e-6
+    def _handle_transmission_expire(self, event, sim_time: float):
+        tx = event.data["transmission"]
+        # Expiries fire in end-time order, so this is almost always the head of the list
+        self.active_transmissions.remove(tx)
         
-        for i, (beacon, start, end, potential_count, processed_count) in enumerate(self.active_transmissions):
-            if end + grace_period <= sim_time:
-                expired_indices.append(i)
-                
-                if self.ideal_channel:
-                    beacon_key = (beacon.sender_id, beacon.timestamp)
-                    if beacon_key not in self.collision_beacons:
-                        unprocessed = potential_count - processed_count
-                        if unprocessed > 0:
-                            for _ in range(unprocessed):
-                                if self.metrics:
-                                    self.metrics.log_actually_received(beacon.sender_id)
-                                    logging.log_info(f"Ideal channel: marking {unprocessed} unreached as received for {str(beacon.sender_id)[:6]}")
-
-        for idx in sorted(expired_indices, reverse=True):
-            self.active_transmissions.pop(idx)
+        if self.ideal_channel:
+            beacon = tx.beacon
+            beacon_key = (beacon.sender_int, beacon.timestamp)
+            if beacon_key not in self.collision_beacons:
+                unprocessed = tx.potential - tx.processed
+                if unprocessed > 0:
+                    for _ in range(unprocessed):
+                        if self.metrics:
+                            self.metrics.log_actually_received(beacon.sender_id)
+                            logging.log_info("Ideal channel: marking %d unreached as received for %.6s", unprocessed, beacon.sender_id)
 
     def broadcast(self, beacon: Beacon, sim_time: float) -> bool:
-        logging.log_info(f"Broadcasting from {str(beacon.sender_id)[:6]} at {sim_time:.2f}s")
+        logging.log_info("Broadcasting from %.6s at %.2fs", beacon.sender_id, sim_time)
         
         if self.metrics:
             self.metrics.log_sent()
@@ -78,30 +140,62 @@ class Channel:
         transmission_time = beacon.size_bits() / self.bit_rate
         new_end_time = sim_time + transmission_time
 
-        receivers_in_range = [
-            buoy for buoy in self.buoys
-            if buoy.id != beacon.sender_id and self.in_range(beacon.position, buoy.position)
-        ]
+        # Range checks are inlined against a local squared range in the loops below
+        sender_x, sender_y = beacon.position
+        sender_int = beacon.sender_int
+        range_max_sq = self.comm_range_max_sq
+        # Senders further apart than twice the range share no receiver
+        interference_range_sq = 4 * range_max_sq
+        
+        receivers_in_range = []
+        receiver_distances_sq = []  # kept for the delivery pass, parallel to receivers_in_range
+        for buoy in self.buoys_near(beacon.position):
+            if buoy.int_id == sender_int:
+                continue
+            buoy_x, buoy_y = buoy.position
+            dx = buoy_x - sender_x
+            dy = buoy_y - sender_y
+            distance_sq = dx * dx + dy * dy
+            if distance_sq <= range_max_sq:
+                receivers_in_range.append(buoy)
+                receiver_distances_sq.append(distance_sq)
         n_receivers = len(receivers_in_range)
         
         if self.metrics:
             self.metrics.log_potentially_sent(beacon.sender_id, n_receivers)
 
-        beacon_key = (beacon.sender_id, beacon.timestamp)
+        beacon_key = (beacon.sender_int, beacon.timestamp)
         receivers_with_collisions = set()
 
-        for i, (existing, start, end, _, _) in enumerate(self.active_transmissions):
-            if beacon.sender_id == existing.sender_id:
+        active = self.active_transmissions
+        if not active or active[-1].end < sim_time:
+            # The list is sorted by end, so a finished tail means the channel is quiet
+            live_transmissions = ()
+        else:
+            # Everything before `first_live` ended before sim_time and cannot overlap
+            first_live = bisect.bisect_left(active, sim_time, key=_tx_end)
+            live_transmissions = active[first_live:]
+        
+        for tx in live_transmissions:
+            existing = tx.beacon
+            if sender_int == existing.sender_int:
                 continue
             
-            time_overlap = (sim_time <= end) and (start <= new_end_time)
+            time_overlap = tx.start <= new_end_time
             if not time_overlap:
                 continue
             
-            existing_key = (existing.sender_id, existing.timestamp)
+            existing_key = (existing.sender_int, existing.timestamp)
+            existing_x, existing_y = existing.position
+            dx = sender_x - existing_x
+            dy = sender_y - existing_y
+            distance_sq = dx * dx + dy * dy
             
-            if self.in_range(beacon.position, existing.position):
-                logging.log_error(f"Direct collision between {str(beacon.sender_id)[:6]} and {str(existing.sender_id)[:6]}")
+            if distance_sq > interference_range_sq:
+                continue
+            
+            if distance_sq <= range_max_sq:
+                logging.log_error("Direct collision between %.6s and %.6s", beacon.sender_id, existing.sender_id)
                 self.collision_beacons.add(beacon_key)
                 self.collision_beacons.add(existing_key)
                 
@@ -110,14 +204,17 @@ class Channel:
                     
             else:
                 for receiver in receivers_in_range:
-                    if self.in_range(receiver.position, existing.position):
-                        logging.log_error(f"Collision at receiver {str(receiver.id)[:6]} between {str(beacon.sender_id)[:6]} and {str(existing.sender_id)[:6]}")
+                    receiver_x, receiver_y = receiver.position
+                    dx = receiver_x - existing_x
+                    dy = receiver_y - existing_y
+                    if dx * dx + dy * dy <= range_max_sq:
+                        logging.log_error("Collision at receiver %.6s between %.6s and %.6s", receiver.id, beacon.sender_id, existing.sender_id)
                         receivers_with_collisions.add(receiver.id)
                         self.collision_beacons.add(beacon_key)
                         self.collision_beacons.add(existing_key)
 
-        successful_receivers = 0
-        self.active_transmissions.append((beacon, sim_time, new_end_time, n_receivers, successful_receivers))
+        transmission = Transmission(beacon, sim_time, new_end_time, n_receivers)
+        bisect.insort(self.active_transmissions, transmission, key=_tx_end)
         
         self.simulator.schedule_event(
             new_end_time, 
@@ -125,46 +222,54 @@ class Channel:
             self,
             {"beacon": beacon}
         )
+        # Drop it once every receiver has had the chance to hear it
+        self.simulator.schedule_event(
+            new_end_time + self.grace_period,
+            EventType.TRANSMISSION_EXPIRE,
+            self,
+            {"transmission": transmission}
+        )
         
-        total_lost = 0
         collision_lost = len(receivers_with_collisions)
         probability_lost = 0
         
-        for receiver in receivers_in_range:
-            dx = receiver.position[0] - beacon.position[0]
-            dy = receiver.position[1] - beacon.position[1]
-            distance = math.hypot(dx, dy)
-            propagation_delay = distance / self.speed_of_light
-            reception_time = new_end_time + propagation_delay + 1e-9
-            
-            collision_loss = receiver.id in receivers_with_collisions
-            will_receive = False
-            
-            if self.ideal_channel:
-                will_receive = not collision_loss
-            else:
-                probability_loss = False
+        # Per-receiver delivery pass: keep its lookups in locals
+        speed_of_light = self.speed_of_light
+        range_high_sq = self.comm_range_high_prob_sq
+        prob_high, prob_low = self.delivery_prob_high, self.delivery_prob_low
+        rand = random.random
+        # Handlers only read event data, so every reception shares one dict
+        reception_data = {"beacon": beacon, "transmission": transmission}
+        receptions = []
+        
+        # The mode is fixed for the run, so each case gets its own loop and the
+        # propagation delay is only worked out for receivers that will hear it
+        if self.ideal_channel:
+            for receiver, distance_sq in zip(receivers_in_range, receiver_distances_sq):
+                if receiver.id in receivers_with_collisions:
+                    continue
+                reception_time = new_end_time + math.sqrt(distance_sq) / speed_of_light + 1e-9
+                receptions.append((reception_time, EventType.RECEPTION, receiver, reception_data))
+        else:
+            for receiver, distance_sq in zip(receivers_in_range, receiver_distances_sq):
+                if receiver.id in receivers_with_collisions:
+                    continue
                 
-                if not collision_loss:
-                    random_val = random.random()
-                    
-                    if distance <= self.comm_range_high_prob:
-                        probability_loss = random_val >= self.delivery_prob_high
-                    elif distance <= self.comm_range_max:
-                        probability_loss = random_val >= self.delivery_prob_low
-                    
-                    if probability_loss:
-                        probability_lost += 1
+                random_val = rand()
+                if distance_sq <= range_high_sq:
+                    probability_loss = random_val >= prob_high
+                else:
+                    probability_loss = random_val >= prob_low
                 
-                will_receive = not (collision_loss or probability_loss)
-            
-            if will_receive:
-                self.simulator.schedule_event(
-                    reception_time,
-                    EventType.RECEPTION, 
-                    receiver,
-                    {"beacon": beacon, "collision_checked": True}
-                )
+                if probability_loss:
+                    probability_lost += 1
+                    continue
+                
+                reception_time = new_end_time + math.sqrt(distance_sq) / speed_of_light + 1e-9
+                receptions.append((reception_time, EventType.RECEPTION, receiver, reception_data))
+        
+        if receptions:
+            self.simulator.schedule_events_bulk(receptions)
         
         total_lost = collision_lost + probability_lost
         
@@ -175,29 +280,22 @@ class Channel:
             
             if total_lost > 0:
                 self.metrics.log_lost(total_lost)
-                logging.log_info(f"Lost {total_lost} packets: {collision_lost} from collisions, {probability_lost} from probability")
+                logging.log_info("Lost %d packets: %d from collisions, %d from probability", total_lost, collision_lost, probability_lost)
         
         return True
 
     def is_busy(self, position: Tuple[float, float], sim_time: float) -> bool:
-        for beacon, start, end, _, _ in self.active_transmissions:
-            if start <= sim_time <= end:
-                sender_position = beacon.position
+        for tx in self.active_transmissions:
+            if tx.start <= sim_time <= tx.end:
+                sender_position = tx.beacon.position
                 
                 dx = position[0] - sender_position[0]
                 dy = position[1] - sender_position[1]
-                distance = math.hypot(dx, dy)
+                distance_sq = dx * dx + dy * dy
                 
-                wavefront_radius = self.speed_of_light * (sim_time - start)
-                detection_range = self.comm_range_high_prob
+                wavefront_radius = self.speed_of_light * (sim_time - tx.start)
                 
-                if distance <= wavefront_radius and distance <= detection_range:
+                if distance_sq <= wavefront_radius * wavefront_radius and distance_sq <= self.comm_range_high_prob_sq:
                     return True
                 
         return False
-
-    def in_range(self, pos1: Tuple[float, float], pos2: Tuple[float, float]) -> bool:
-        dx = pos1[0] - pos2[0]
-        dy = pos1[1] - pos2[1]
-        distance = math.hypot(dx, dy)
-        return distance <= self.comm_range_max
\ No newline at end of file
@@ -2,6 +2,8 @@ import time
 import heapq
 from typing import List, Dict, Optional
 import random
+import numpy as np
+from scipy.spatial import cKDTree
 from utils.metrics import Metrics
 from buoys.buoy import Buoy
 from core.channel import Channel
@@ -9,12 +11,17 @@ from core.events import EventType
 from config.config_handler import ConfigHandler
 from utils import logging
 
+# Shared by every event scheduled without data; handlers only read event.data
+EMPTY_DATA = {}
+
 class Event:
+    __slots__ = ('time', 'event_type', 'target_obj', 'data')
+
     def __init__(self, time: float, event_type: EventType, target_obj, data: Optional[Dict] = None):
         self.time = time
         self.event_type = event_type
         self.target_obj = target_obj
-        self.data = data or {}
+        self.data = data or EMPTY_DATA
 
 class Simulator:
     def __init__(self, buoys: List[Buoy], channel: Channel, metrics: Metrics, ramp: bool = False, duration: float = None):
@@ -26,7 +33,6 @@ class Simulator:
         self.ramp = ramp
         self.all_buoys = buoys.copy()
         self.first_change = True
-        self.next_buoy_change = 0
         self.duration = duration if duration is not None else cfg.get('simulation', 'duration')
         
         self.neighbor_timeout = cfg.get('scheduler', 'neighbor_timeout')
@@ -36,34 +42,79 @@ class Simulator:
             self.buoys = self.all_buoys[:2]
         else:
             self.buoys = buoys
+        self.active_set = set(self.buoys)  # membership mirror of self.buoys
+
+        # Positions of every buoy, active or not, kept in step by Buoy so sampling needs no rebuild
+        self.positions = np.zeros((len(self.all_buoys), 2), dtype=np.float64)
+        for slot, buoy in enumerate(self.all_buoys):
+            self.positions[slot] = buoy.position
+            buoy.position_view = self.positions[slot]
+        self.slots = {buoy: slot for slot, buoy in enumerate(self.all_buoys)}
+        self.inactive_set = set(self.all_buoys) - self.active_set
+        self._refresh_active_slots()
 
         self.channel.set_buoys(self.buoys)
         self.channel.simulator = self
         self.running = False
         self.simulated_time = 0.0
+        # Next progress log and ramp sample, on 10s and 5s boundaries
+        self.next_log_time = 10.0
+        self.next_sample_time = 5.0
 
         for buoy in self.buoys:
             buoy.simulator = self
 
         self.event_queue = []
         self.event_counter = 0
+        self.event_pool = []  # dispatched events, reused by schedule_event
+
+        self.handlers = {
+            EventType.BUOY_ARRAY_UPDATE: self.update_buoy_array,
+            EventType.AVG_NEIGHBORS_CALCULATION: self._handle_avg_neighbors_calculation
+        }
 
         # Calculate initial avg_neighbors
         self.calculate_and_record_avg_neighbors()
         self._schedule_initial_events()
 
     def schedule_event(self, time: float, event_type: EventType, target_obj, data: Optional[Dict] = None) -> None:
-        event = Event(time, event_type, target_obj, data)
-        epsilon = self.event_counter * 1e-10
+        if self.event_pool:
+            event = self.event_pool.pop()
+            event.time = time
+            event.event_type = event_type
+            event.target_obj = target_obj
+            event.data = data or EMPTY_DATA
+        else:
+            event = Event(time, event_type, target_obj, data)
+        # The counter breaks ties in FIFO order before the event itself is ever compared
+        heapq.heappush(self.event_queue, (time, self.event_counter, event))
         self.event_counter += 1
-        heapq.heappush(self.event_queue, (event.time + epsilon, self.event_counter, event))
     
-    def _get_next_event(self) -> Optional[Event]:
-        if not self.event_queue:
-            return None
-        _, _, event = heapq.heappop(self.event_queue)
-        return event
-
+    def schedule_events_bulk(self, events: List[tuple]) -> None:
+        # events are (time, event_type, target_obj, data) tuples, queued in list order
+        queue = self.event_queue
+        pool = self.event_pool
+        entries = []
+        for event_time, event_type, target_obj, data in events:
+            if pool:
+                event = pool.pop()
+                event.time = event_time
+                event.event_type = event_type
+                event.target_obj = target_obj
+                event.data = data or EMPTY_DATA
+            else:
+                event = Event(event_time, event_type, target_obj, data)
+            entries.append((event_time, self.event_counter, event))
+            self.event_counter += 1
+        
+        # heapify is O(len(queue)), so it only pays off when the batch is a sizeable share of the queue
+        if len(entries) * 8 >= len(queue):
+            queue.extend(entries)
+            heapq.heapify(queue)
+        else:
+            for entry in entries:
+                heapq.heappush(queue, entry)
+    
     def _schedule_initial_events(self):
         for buoy in self.buoys:
             initial_offset = random.uniform(0, 1.0)
@@ -73,24 +124,28 @@ class Simulator:
             if buoy.is_mobile:
                 self.schedule_event(0.1, EventType.BUOY_MOVEMENT, buoy)
         
-        self.schedule_event(1.0, EventType.CHANNEL_UPDATE, self.channel)
         self.schedule_event(30.0, EventType.BUOY_ARRAY_UPDATE, self)
         
         # Schedule periodic avg_neighbors calculation every 30 seconds
         self.schedule_event(30.0, EventType.AVG_NEIGHBORS_CALCULATION, self)
 
+    def _refresh_active_slots(self):
+        self.active_slots = np.array([self.slots[buoy] for buoy in self.buoys], dtype=np.intp)
+
     def update_buoy_array(self, event, sim_time: float):
         if self.ramp:
             self._update_buoy_array_ramp(sim_time)
         else:
             self._update_buoy_array_random(sim_time)
+        self._refresh_active_slots()
         
         # Recalculate avg_neighbors after buoy array changes
         self.calculate_and_record_avg_neighbors()
 
     def _update_buoy_array_random(self, sim_time: float):
-        active_buoys = self.buoys.copy()
-        inactive_buoys = [b for b in self.all_buoys if b not in active_buoys]
+        active_buoys = self.buoys  # only read before self.buoys changes, so no copy
+        # Sampled in all_buoys order so seeded runs stay reproducible
+        inactive_buoys = sorted(self.inactive_set, key=self.slots.__getitem__)
         total_buoys = len(self.all_buoys)
 
         if self.first_change or (random.random() >= 0.5 and len(active_buoys) > max(3, int(total_buoys * 0.2))):
@@ -104,13 +159,15 @@ class Simulator:
                 num_to_remove = max_to_remove if max_to_remove <= 2 else random.randint(1, max_to_remove)
                 buoys_to_remove = random.sample(active_buoys, num_to_remove)
                 
+                # One filter pass instead of a list.remove() per buoy
+                self.active_set.difference_update(buoys_to_remove)
+                self.inactive_set.update(buoys_to_remove)
+                self.buoys = [b for b in self.buoys if b in self.active_set]
                 for buoy in buoys_to_remove:
-                    if buoy in self.buoys:
-                        self.buoys.remove(buoy)
-                        logging.log_info(f"Removed buoy {str(buoy.id)[:6]} at {sim_time:.2f}s")
+                    logging.log_info("Removed buoy %.6s at %.2fs", buoy.id, sim_time)
 
                 self.channel.set_buoys(self.buoys)
-                logging.log_info(f"Removed {num_to_remove} buoys, now {len(self.buoys)} active at {sim_time:.2f}s")
+                logging.log_info("Removed %d buoys, now %d active at %.2fs", num_to_remove, len(self.buoys), sim_time)
 
                 if self.first_change:
                     logging.log_info("First buoy change: forced major removal operation")
@@ -123,6 +180,8 @@ class Simulator:
             
             for buoy in buoys_to_add:
                 self.buoys.append(buoy)
+                self.active_set.add(buoy)
+                self.inactive_set.discard(buoy)
                 buoy.simulator = self
                 initial_offset = random.uniform(0, 1.0) 
                 self.schedule_event(sim_time + initial_offset, EventType.SCHEDULER_CHECK, buoy)
@@ -130,27 +189,28 @@ class Simulator:
                 if hasattr(buoy, 'is_mobile') and buoy.is_mobile:
                     self.schedule_event(sim_time + 0.1, EventType.BUOY_MOVEMENT, buoy)
                 
-                logging.log_info(f"Added buoy {str(buoy.id)[:6]} at {sim_time:.2f}s")
+                logging.log_info("Added buoy %.6s at %.2fs", buoy.id, sim_time)
                 
             self.channel.set_buoys(self.buoys)
-            logging.log_info(f"Added {num_to_add} buoys, now {len(self.buoys)} active at {sim_time:.2f}s")
+            logging.log_info("Added %d buoys, now %d active at %.2fs", num_to_add, len(self.buoys), sim_time)
             self.first_change = False
 
         next_change_time = sim_time + random.uniform(15, 20)
         self.schedule_event(next_change_time, EventType.BUOY_ARRAY_UPDATE, self)
 
     def _update_buoy_array_ramp(self, sim_time: float):
-        active_buoys = self.buoys.copy()
-        inactive_buoys = [b for b in self.all_buoys if b not in active_buoys]
-        current_count = len(active_buoys)
+        current_count = len(self.buoys)
         total_buoys = len(self.all_buoys)
         buoys_to_add = total_buoys - 2
         add_interval = self.duration / buoys_to_add if buoys_to_add > 0 else self.duration
     
         if current_count < total_buoys:
-            if inactive_buoys:
-                buoy = inactive_buoys[0]
+            if self.inactive_set:
+                # Ramp adds buoys in all_buoys order
+                buoy = min(self.inactive_set, key=self.slots.__getitem__)
                 self.buoys.append(buoy)
+                self.active_set.add(buoy)
+                self.inactive_set.discard(buoy)
                 buoy.simulator = self
                 initial_offset = random.uniform(0, 0.01)
                 self.schedule_event(sim_time + initial_offset, EventType.SCHEDULER_CHECK, buoy)
@@ -159,43 +219,55 @@ class Simulator:
             self.schedule_event(sim_time + add_interval, EventType.BUOY_ARRAY_UPDATE, self)
 
     def handle_event(self, event, sim_time: float):
-        if event.event_type == EventType.BUOY_ARRAY_UPDATE:
-            self.update_buoy_array(event, sim_time)
-        elif event.event_type == EventType.AVG_NEIGHBORS_CALCULATION:
-            self.calculate_and_record_avg_neighbors()
-            # Schedule next calculation
-            self.schedule_event(sim_time + 30.0, EventType.AVG_NEIGHBORS_CALCULATION, self)
+        handler = self.handlers.get(event.event_type)
+        if handler:
+            handler(event, sim_time)
+
+    def _handle_avg_neighbors_calculation(self, event, sim_time: float):
+        self.calculate_and_record_avg_neighbors()
+        # Schedule next calculation
+        self.schedule_event(sim_time + 30.0, EventType.AVG_NEIGHBORS_CALCULATION, self)
 
     def start(self):
         self.running = True
         real_time_start = time.time()
         
+        # Hot loop: bind the queue and heappop once
+        queue = self.event_queue
+        heappop = heapq.heappop
+        release = self.event_pool.append
+        duration = self.duration
+        
         try:
-            while self.running and self.simulated_time < self.duration:
-                event = self._get_next_event()
-                if not event:
+            while self.running and self.simulated_time < duration:
+                if not queue:
                     logging.log_info("No more events to process.")
                     break
+                _, _, event = heappop(queue)
                 
                 self.simulated_time = event.time
                 
-                if event.event_type in [EventType.TRANSMISSION_START, EventType.RECEPTION]:
-                    logging.log_info(f"Processing {event}")
+                if event.event_type in (EventType.TRANSMISSION_START, EventType.RECEPTION):
+                    logging.log_info("Processing %s", event)
                     
-                if int(self.simulated_time) % 10 == 0 and self.simulated_time > 0:
-                    logging.log_info(f"Time: {self.simulated_time:.2f}s, Event queue size: {len(self.event_queue)}")
+                if self.simulated_time >= self.next_log_time:
+                    logging.log_info("Time: %.2fs, Event queue size: %d", self.simulated_time, len(queue))
+                    self.next_log_time = (self.simulated_time // 10.0 + 1) * 10.0
                 
                 try:
-                    if event.target_obj == self:
+                    if event.target_obj is self:
                         self.handle_event(event, self.simulated_time)
                     else:
                         event.target_obj.handle_event(event, self.simulated_time)
                 except Exception as e:
-                    logging.log_error(f"Error handling event {event}: {str(e)}")
+                    logging.log_error("Error handling event %s: %s", event, e)
+                # Nothing keeps a dispatched event, so it goes back to the pool
+                release(event)
                 
-                if self.ramp and int(self.simulated_time) % 5 == 0 and self.simulated_time > 0:
+                if self.ramp and self.simulated_time >= self.next_sample_time:
                     avg_neighbors_sample = self.calculate_avg_neighbors()
                     self.metrics.log_timepoint(self.simulated_time, len(self.buoys), avg_neighbors_sample)
+                    self.next_sample_time = (self.simulated_time // 5.0 + 1) * 5.0
 
         except KeyboardInterrupt:
             logging.log_info("Simulation interrupted by user.")
@@ -204,25 +276,17 @@ class Simulator:
         real_time_end = time.time()
         real_duration = real_time_end - real_time_start
         sim_speedup = self.simulated_time / real_duration if real_duration > 0 else float('inf')
-        logging.log_info(f"Simulation complete. {self.simulated_time:.2f}s simulated in {real_duration:.2f}s real time (speedup: {sim_speedup:.2f}x)")
+        logging.log_info("Simulation complete. %.2fs simulated in %.2fs real time (speedup: %.2fx)", self.simulated_time, real_duration, sim_speedup)
     
     def calculate_avg_neighbors(self):
         if not self.buoys:
             return 0.0
             
-        total_neighbors = 0
+        # Pair count from a KD-tree: O(N log N) with no N x N distance matrix
+        tree = cKDTree(self.positions[self.active_slots])
         
-        for buoy in self.buoys:
-            neighbor_count = 0
-            for other_buoy in self.buoys:
-                if buoy.id != other_buoy.id:
-                    dx = buoy.position[0] - other_buoy.position[0]
-                    dy = buoy.position[1] - other_buoy.position[1]
-                    distance = (dx**2 + dy**2)**0.5
-                    
-                    if distance <= self.comm_range_max:
-                        neighbor_count += 1
-            total_neighbors += neighbor_count
+        # Each buoy is counted against itself too, so take those pairs back out
+        total_neighbors = int(tree.count_neighbors(tree, self.comm_range_max)) - len(self.buoys)
         
         return total_neighbors / len(self.buoys)
     
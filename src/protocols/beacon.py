@@ -1,8 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Tuple, List, Optional
 import uuid
 
-@dataclass
+# UUIDs are folded to a positive int64 once so hot-path id checks are plain int compares
+INT_ID_MASK = (1 << 63) - 1
+
+@dataclass(slots=True)
 class Beacon:
     sender_id: uuid.UUID # 16 bytes
     mobile: bool # 1 byte
@@ -12,6 +15,10 @@ class Beacon:
     timestamp: float # 4 bytes
     origin_id: Optional[uuid.UUID] = None  # 16 bytes (only in forwarded mode)
     hop_limit: int = 0  # 4 bytes (only in forwarded mode)
+    sender_int: int = field(init=False, repr=False, compare=False)  # not transmitted
+
+    def __post_init__(self):
+        self.sender_int = self.sender_id.int & INT_ID_MASK
 
     def size_bytes(self) -> int:
         # Base size: sender_id(16) + mobile(1) + position(8) + battery(4) + timestamp(4) = 37 bytes
@@ -2,9 +2,17 @@ import os
 import pandas as pd
 import numpy as np
 import glob
+import matplotlib
+matplotlib.use("Agg")  # plots are only ever saved to disk
 import matplotlib.pyplot as plt
 import re
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from result_files import SCALAR_CSV_OPTIONS, TIMESERIES_CSV_OPTIONS, extract_interval_from_dirname, read_csvs, scheduler_type
+
+# Directory-name pattern, compiled once at import
+INTERVAL_SUFFIX_RE = re.compile(r'(interval\d+.*)')
 
 def average_metrics(input_dirs, output_dir):
     # Identify subdirectories in each input directory
@@ -14,87 +22,66 @@ def average_metrics(input_dirs, output_dir):
                    if os.path.isdir(os.path.join(input_dir, d))]
         all_subdirs.update(subdirs)
     
-    # Process each subdirectory separately
-    for subdir in all_subdirs:
-        # Extract the interval part from the subdirectory name
-        interval_part = re.search(r'(interval\d+.*)', subdir)
-        if interval_part:
-            interval_suffix = interval_part.group(1)
-        else:
-            interval_suffix = subdir
-        
-        # Create results and plots directories directly in output_dir
-        results_dir = os.path.join(output_dir, f"results_{interval_suffix}")
-        plots_dir = os.path.join(output_dir, f"plots_{interval_suffix}")
-        
-        os.makedirs(results_dir, exist_ok=True)
-        os.makedirs(plots_dir, exist_ok=True)
-        
-        # Collect input paths
-        subdir_input_paths = [os.path.join(input_dir, subdir) for input_dir in input_dirs 
-                             if os.path.isdir(os.path.join(input_dir, subdir))]
-        
-        print(f"Processing {subdir}...")
-        print(f"  Results will be saved to: {results_dir}")
-        print(f"  Plots will be saved to: {plots_dir}")
-        
-        # Process density files (static_density*.csv, dynamic_density*.csv)
-        process_density_files(subdir_input_paths, results_dir)
-        
-        # Process ramp timeseries files
-        process_timeseries_files(subdir_input_paths, results_dir)
-        
-        # Extract interval from subdirectory name for plotting
-        interval = extract_interval_from_dirname(subdir)
-        
-        # Generate plots in the plot directory
-        plot_averaged_metrics(results_dir, plots_dir, interval)
+    # Each subdirectory is averaged and plotted independently, so run them in parallel
+    subdirs = sorted(all_subdirs)
+    if len(subdirs) > 1:
+        with ProcessPoolExecutor() as executor:
+            list(executor.map(partial(average_subdir, input_dirs=input_dirs, output_dir=output_dir), subdirs))
+    else:
+        for subdir in subdirs:
+            average_subdir(subdir, input_dirs, output_dir)
 
-def extract_interval_from_dirname(dirname):
-    """
-    Hard-coded interval mapping based on directory naming convention.
-    interval1_ideal -> 1.0s
-    interval2_5_ideal -> 0.25s  
-    interval5_ideal -> 0.5s
-    """
-    # Hard-coded mappings
-    if 'interval1' in dirname:
-        return 1.0
-    elif 'interval2_5' in dirname or 'interval2.5' in dirname:
-        return 0.25
-    elif 'interval5' in dirname:
-        return 0.5
-    
-    # Fallback: try to parse from dirname if it doesn't match known patterns
-    match = re.search(r'interval(\d+(?:_\d+)?)', dirname)
-    if match:
-        interval_str = match.group(1).replace('_', '.')
-        try:
-            return float(interval_str)
-        except ValueError:
-            return None
-    
-    return None
+def average_subdir(subdir, input_dirs, output_dir):
+    # Extract the interval part from the subdirectory name
+    interval_part = INTERVAL_SUFFIX_RE.search(subdir)
+    if interval_part:
+        interval_suffix = interval_part.group(1)
+    else:
+        interval_suffix = subdir
+    
+    # Create results and plots directories directly in output_dir
+    results_dir = os.path.join(output_dir, f"results_{interval_suffix}")
+    plots_dir = os.path.join(output_dir, f"plots_{interval_suffix}")
+    
+    os.makedirs(results_dir, exist_ok=True)
+    os.makedirs(plots_dir, exist_ok=True)
+    
+    # Collect input paths
+    subdir_input_paths = [os.path.join(input_dir, subdir) for input_dir in input_dirs 
+                         if os.path.isdir(os.path.join(input_dir, subdir))]
+    
+    print(f"Processing {subdir}...")
+    print(f"  Results will be saved to: {results_dir}")
+    print(f"  Plots will be saved to: {plots_dir}")
+    
+    # Process density files (static_density*.csv, dynamic_density*.csv)
+    process_density_files(subdir_input_paths, results_dir)
+    
+    # Process ramp timeseries files
+    process_timeseries_files(subdir_input_paths, results_dir)
+    
+    # Extract interval from subdirectory name for plotting
+    interval = extract_interval_from_dirname(subdir)
+    
+    # Generate plots in the plot directory
+    plot_averaged_metrics(results_dir, plots_dir, interval)
 
 def process_density_files(input_dirs, output_dir):
     # Dictionary to store dataframes by file pattern
     all_data = {}
     
-    # Collect all CSV files from input directories
-    for input_dir in input_dirs:
-        csv_files = glob.glob(os.path.join(input_dir, "*_density*.csv"))
+    # Collect all CSV files from input directories and read them in one batch
+    csv_files = [csv_file for input_dir in input_dirs
+                 for csv_file in glob.glob(os.path.join(input_dir, "*_density*.csv"))]
+    
+    for csv_file, df in zip(csv_files, read_csvs(csv_files, **SCALAR_CSV_OPTIONS)):
+        # Extract base filename (e.g., "static_density10.csv")
+        base_name = os.path.basename(csv_file)
         
-        for csv_file in csv_files:
-            # Extract base filename (e.g., "static_density10.csv")
-            base_name = os.path.basename(csv_file)
-            
-            # Load the data
-            df = pd.read_csv(csv_file, index_col=0)
-            
-            if base_name not in all_data:
-                all_data[base_name] = []
-            
-            all_data[base_name].append(df)
+        if base_name not in all_data:
+            all_data[base_name] = []
+        
+        all_data[base_name].append(df)
     
     # Average the metrics for each file pattern
     for base_name, dataframes in all_data.items():
@@ -105,8 +92,9 @@ def process_density_files(input_dirs, output_dir):
         
         # Create a new dataframe with averaged values
         avg_data = {}
+        value_maps = [df["Value"].to_dict() for df in dataframes]
         for metric in common_metrics:
-            values = [df.loc[metric, "Value"] for df in dataframes]
+            values = [vals[metric] for vals in value_maps]
             
             # Try to convert to numeric for averaging
             try:
@@ -128,13 +116,17 @@ def process_timeseries_files(input_dirs, output_dir):
     # Dictionary to store timeseries data by mode
     timeseries_data = {"static": [], "dynamic_acab": [], "dynamic_adab": []}
     
-    # Collect all timeseries CSV files
+    # Collect all timeseries CSV files and read them in one batch
+    ts_files = []
     for input_dir in input_dirs:
         for mode in timeseries_data.keys():
             ts_file = os.path.join(input_dir, f"{mode}_ramp_timeseries.csv")
             if os.path.exists(ts_file):
-                df = pd.read_csv(ts_file)
-                timeseries_data[mode].append(df)
+                ts_files.append((mode, ts_file))
+    
+    frames = read_csvs([ts_file for _, ts_file in ts_files], **TIMESERIES_CSV_OPTIONS)
+    for (mode, _), df in zip(ts_files, frames):
+        timeseries_data[mode].append(df)
     
     # Process each mode
     for mode, dataframes in timeseries_data.items():
@@ -142,8 +134,8 @@ def process_timeseries_files(input_dirs, output_dir):
             continue
         
         # For timeseries, we need to align by time points
-        # Get the set of time points from all dataframes
-        all_times = sorted(set().union(*[set(df["time"]) for df in dataframes]))
+        # Get the sorted union of time points from all dataframes
+        all_times = np.unique(np.concatenate([df["time"].to_numpy() for df in dataframes]))
         
         # Create a new dataframe with aligned time points
         avg_df = pd.DataFrame({"time": all_times})
@@ -184,11 +176,17 @@ def process_timeseries_files(input_dirs, output_dir):
         avg_df.to_csv(os.path.join(output_dir, f"{mode}_ramp_timeseries.csv"), index=False)
 
 def plot_averaged_metrics(data_dir, plot_dir, interval=None):
+    # Both density plots read the same averaged files, so parse them once
+    try:
+        frames = get_density_dataframes(data_dir)
+    except Exception:
+        frames = None  # each plot retries and reports the error itself
+    
     # Plot block by density with error bars
-    plot_block_by_density_with_errors(data_dir, plot_dir, interval)
+    plot_block_by_density_with_errors(data_dir, plot_dir, interval, frames=frames)
     
     # Plot unique nodes by density with error bars
-    plot_unique_nodes_by_density_with_errors(data_dir, plot_dir, interval)
+    plot_unique_nodes_by_density_with_errors(data_dir, plot_dir, interval, frames=frames)
     
     # Plot timeseries with error bands
     plot_timeseries_with_errors(data_dir, plot_dir, interval)
@@ -207,61 +205,48 @@ def get_density_dataframes(data_dir):
     unique_nodes_data = []
     
     # Extract data from CSV files
-    for f in files:
-        df = pd.read_csv(f, index_col=0)
+    for f, df in zip(files, read_csvs(files, **SCALAR_CSV_OPTIONS)):
+        # Plain dicts keep the per-metric lookups below off the pandas indexer
+        vals = df["Value"].to_dict()
+        stds = df["StdDev"].to_dict()
         
         # Extract multihop mode
         multihop_mode = "none"
-        if "Multihop Mode" in df.index:
-            multihop_mode = str(df.loc["Multihop Mode", "Value"]).lower()
+        if "Multihop Mode" in vals:
+            multihop_mode = str(vals["Multihop Mode"]).lower()
         
         # Determine scheduler type
-        if "Scheduler Type" in df.index:
-            sched_type = str(df.loc["Scheduler Type", "Value"]).lower()
-        elif os.path.basename(f).startswith("static_"):
-            sched_type = "static"
-        elif os.path.basename(f).startswith("dynamic_acab_"):
-            sched_type = "dynamic_acab"
-        elif os.path.basename(f).startswith("dynamic_adab_"):
-            sched_type = "dynamic_adab"
-        elif os.path.basename(f).startswith("dynamic_"):
-            sched_type = "dynamic_adab"
-        else:
-            sched_type = "unknown"
+        sched_type = scheduler_type(f, vals) or "unknown"
+        
+        # Every row below is keyed by density, so convert the shared values once per file
+        if "Density" not in vals:
+            continue
+        density = float(vals["Density"])
+        
+        avg_neighbors = None
+        if "Average Neighbors" in vals:
+            avg_neighbors = float(vals["Average Neighbors"])
+        elif "Avg Neighbors" in vals:
+            avg_neighbors = float(vals["Avg Neighbors"])
         
         # Extract B-PDR data
-        if "Density" in df.index and ("Delivery Ratio" in df.index or "B-PDR" in df.index):
-            density = float(df.loc["Density", "Value"])
-            pdr = float(df.loc["B-PDR", "Value"]) if "B-PDR" in df.index else float(df.loc["Delivery Ratio", "Value"])
-            pdr_std = float(df.loc["B-PDR", "StdDev"]) if "B-PDR" in df.index else float(df.loc["Delivery Ratio", "StdDev"])
-            
-            avg_neighbors = None
-            if "Average Neighbors" in df.index:
-                avg_neighbors = float(df.loc["Average Neighbors", "Value"])
-            elif "Avg Neighbors" in df.index:
-                avg_neighbors = float(df.loc["Avg Neighbors", "Value"])
+        if "Delivery Ratio" in vals or "B-PDR" in vals:
+            pdr = float(vals["B-PDR"]) if "B-PDR" in vals else float(vals["Delivery Ratio"])
+            pdr_std = float(stds["B-PDR"]) if "B-PDR" in vals else float(stds["Delivery Ratio"])
             
             pdr_data.append((density, pdr, pdr_std, sched_type, avg_neighbors, multihop_mode))
         
         # Extract collision rate data
-        if "Density" in df.index and "Collision Rate" in df.index:
-            density = float(df.loc["Density", "Value"])
-            collision_rate = float(df.loc["Collision Rate", "Value"])
-            collision_std = float(df.loc["Collision Rate", "StdDev"])
-            
-            avg_neighbors = None
-            if "Average Neighbors" in df.index:
-                avg_neighbors = float(df.loc["Average Neighbors", "Value"])
-            elif "Avg Neighbors" in df.index:
-                avg_neighbors = float(df.loc["Avg Neighbors", "Value"])
+        if "Collision Rate" in vals:
+            collision_rate = float(vals["Collision Rate"])
+            collision_std = float(stds["Collision Rate"])
             
             collision_data.append((density, collision_rate, collision_std, sched_type, avg_neighbors, multihop_mode))
         
         # Extract unique nodes data
-        if "Density" in df.index and "Avg Unique Nodes Discovered" in df.index:
-            density = float(df.loc["Density", "Value"])
-            avg_unique = float(df.loc["Avg Unique Nodes Discovered", "Value"])
-            avg_unique_std = float(df.loc["Avg Unique Nodes Discovered", "StdDev"])
+        if "Avg Unique Nodes Discovered" in vals:
+            avg_unique = float(vals["Avg Unique Nodes Discovered"])
+            avg_unique_std = float(stds["Avg Unique Nodes Discovered"])
             
             unique_nodes_data.append((density, avg_unique, avg_unique_std, sched_type, multihop_mode))
     
@@ -272,9 +257,9 @@ def get_density_dataframes(data_dir):
     
     return pdr_df, coll_df, unique_df
 
-def plot_block_by_density_with_errors(data_dir, plot_dir, interval=None):
+def plot_block_by_density_with_errors(data_dir, plot_dir, interval=None, frames=None):
     try:
-        pdr_df, coll_df, _ = get_density_dataframes(data_dir)
+        pdr_df, coll_df, _ = frames if frames is not None else get_density_dataframes(data_dir)
     except Exception as e:
         print(f"Error getting density data: {e}")
         return
@@ -315,21 +300,13 @@ def plot_block_by_density_with_errors(data_dir, plot_dir, interval=None):
     ax2.tick_params(axis='y', labelcolor="black")
     ax2.grid(False)
     
+    # One groupby over both keys; missing (scheduler, density) cells plot as 0
+    cell_means = pdr_df.groupby(["Scheduler", "Density"])[["B-PDR", "StdDev"]].mean()
     offset = -(len(schedulers) - 1) * bar_width / 2
     for i, sched in enumerate(schedulers):
-        values = []
-        errors = []
-        for d in densities:
-            rows = pdr_df[(pdr_df["Density"] == d) & (pdr_df["Scheduler"] == sched)]
-            if not rows.empty:
-                values.append(rows["B-PDR"].mean())
-                errors.append(rows["StdDev"].mean())
-            else:
-                values.append(0)
-                errors.append(0)
-        
-        values_arr = np.array(values)
-        errors_arr = np.array(errors)
+        cells = cell_means.reindex(pd.MultiIndex.from_product([[sched], densities]), fill_value=0)
+        values_arr = cells["B-PDR"].to_numpy()
+        errors_arr = cells["StdDev"].to_numpy()
         lower_errors = np.minimum(errors_arr, values_arr)
         upper_errors = errors_arr
         
@@ -406,21 +383,13 @@ def plot_block_by_density_with_errors(data_dir, plot_dir, interval=None):
     # Create collision rate by density plot with error bars
     fig, ax = plt.subplots(figsize=(10, 6))
     
+    # One groupby over both keys; missing (scheduler, density) cells plot as 0
+    cell_means = coll_df.groupby(["Scheduler", "Density"])[["CollisionRate", "StdDev"]].mean()
     offset = -(len(schedulers) - 1) * bar_width / 2
     for i, sched in enumerate(schedulers):
-        values = []
-        errors = []
-        for d in densities:
-            rows = coll_df[(coll_df["Density"] == d) & (coll_df["Scheduler"] == sched)]
-            if not rows.empty:
-                values.append(rows["CollisionRate"].mean())
-                errors.append(rows["StdDev"].mean())
-            else:
-                values.append(0)
-                errors.append(0)
-        
-        values_arr = np.array(values)
-        errors_arr = np.array(errors)
+        cells = cell_means.reindex(pd.MultiIndex.from_product([[sched], densities]), fill_value=0)
+        values_arr = cells["CollisionRate"].to_numpy()
+        errors_arr = cells["StdDev"].to_numpy()
         lower_errors = np.minimum(errors_arr, values_arr)
         upper_errors = errors_arr
         
@@ -458,10 +427,10 @@ def plot_block_by_density_with_errors(data_dir, plot_dir, interval=None):
         plt.savefig(os.path.join(plot_dir, "collision_rate_block_by_density.png"))
     plt.close()
 
-def plot_unique_nodes_by_density_with_errors(data_dir, plot_dir, interval=None):
+def plot_unique_nodes_by_density_with_errors(data_dir, plot_dir, interval=None, frames=None):
     """Plot average unique nodes discovered (as percentage) vs density with error bars"""
     try:
-        _, _, unique_df = get_density_dataframes(data_dir)
+        _, _, unique_df = frames if frames is not None else get_density_dataframes(data_dir)
     except Exception as e:
         print(f"Error getting unique nodes data: {e}")
         return
@@ -499,21 +468,13 @@ def plot_unique_nodes_by_density_with_errors(data_dir, plot_dir, interval=None):
     
     fig, ax = plt.subplots(figsize=(10, 6))
     
+    # One groupby over both keys; missing (scheduler, density) cells plot as 0
+    cell_means = unique_df.groupby(["Scheduler", "Density"])[["PercentageDiscovered", "PercentageStdDev"]].mean()
     offset = -(len(schedulers) - 1) * bar_width / 2
     for i, sched in enumerate(schedulers):
-        values = []
-        errors = []
-        for d in densities:
-            rows = unique_df[(unique_df["Density"] == d) & (unique_df["Scheduler"] == sched)]
-            if not rows.empty:
-                values.append(rows["PercentageDiscovered"].mean())
-                errors.append(rows["PercentageStdDev"].mean())
-            else:
-                values.append(0)
-                errors.append(0)
-        
-        values_arr = np.array(values)
-        errors_arr = np.array(errors)
+        cells = cell_means.reindex(pd.MultiIndex.from_product([[sched], densities]), fill_value=0)
+        values_arr = cells["PercentageDiscovered"].to_numpy()
+        errors_arr = cells["PercentageStdDev"].to_numpy()
         lower_errors = np.minimum(errors_arr, values_arr)
         upper_errors = np.minimum(errors_arr, 100 - values_arr)
         
@@ -563,7 +524,7 @@ def plot_ramp_grouped_by_buoy_count_with_errors(data_dir, plot_file):
     for mode, _ in modes:
         csv_file = os.path.join(data_dir, f"{mode}_ramp_timeseries.csv")
         if os.path.exists(csv_file):
-            df = pd.read_csv(csv_file)
+            df = pd.read_csv(csv_file, **TIMESERIES_CSV_OPTIONS)
             if "n_buoys" in df.columns:
                 min_buoys = min(min_buoys, df["n_buoys"].min())
                 max_buoys = max(max_buoys, df["n_buoys"].max())
@@ -571,7 +532,7 @@ def plot_ramp_grouped_by_buoy_count_with_errors(data_dir, plot_file):
             
             main_csv = csv_file.replace("_timeseries.csv", ".csv")
             if multihop_mode is None and os.path.exists(main_csv):
-                main_df = pd.read_csv(main_csv, index_col=0)
+                main_df = pd.read_csv(main_csv, usecols=[0, 1], **SCALAR_CSV_OPTIONS)
                 if "Multihop Mode" in main_df.index:
                     multihop_mode = str(main_df.loc["Multihop Mode", "Value"]).lower()
     
@@ -694,7 +655,7 @@ def plot_timeseries_with_errors(data_dir, plot_dir, interval=None):
     for mode, color in modes:
         csv_file = os.path.join(data_dir, f"{mode}_ramp_timeseries.csv")
         if os.path.exists(csv_file):
-            df = pd.read_csv(csv_file)
+            df = pd.read_csv(csv_file, **TIMESERIES_CSV_OPTIONS)
             if "B-PDR" in df.columns:
                 y_col = "B-PDR"
                 std_col = "B-PDR_std"
@@ -732,7 +693,7 @@ def plot_timeseries_with_errors(data_dir, plot_dir, interval=None):
             
             main_csv = csv_file.replace("_timeseries.csv", ".csv")
             if multihop_mode is None and os.path.exists(main_csv):
-                main_df = pd.read_csv(main_csv, index_col=0)
+                main_df = pd.read_csv(main_csv, usecols=[0, 1], **SCALAR_CSV_OPTIONS)
                 if "Multihop Mode" in main_df.index:
                     multihop_mode = str(main_df.loc["Multihop Mode", "Value"]).lower()
 
@@ -807,7 +768,7 @@ def plot_unique_nodes_vs_time_with_errors(data_dir, plot_dir, interval=None):
     for mode, color in modes:
         csv_file = os.path.join(data_dir, f"{mode}_ramp_timeseries.csv")
         if os.path.exists(csv_file):
-            df = pd.read_csv(csv_file)
+            df = pd.read_csv(csv_file, **TIMESERIES_CSV_OPTIONS)
             if "avg_unique_nodes" in df.columns:
                 label = mode_labels.get(mode, mode.capitalize())
                 plt.plot(df["time"], df["avg_unique_nodes"], label=label, color=color)
@@ -831,7 +792,7 @@ def plot_unique_nodes_vs_time_with_errors(data_dir, plot_dir, interval=None):
             
             main_csv = csv_file.replace("_timeseries.csv", ".csv")
             if multihop_mode is None and os.path.exists(main_csv):
-                main_df = pd.read_csv(main_csv, index_col=0)
+                main_df = pd.read_csv(main_csv, usecols=[0, 1], **SCALAR_CSV_OPTIONS)
                 if "Multihop Mode" in main_df.index:
                     multihop_mode = str(main_df.loc["Multihop Mode", "Value"]).lower()
 
@@ -1,6 +1,3 @@
-import os
-os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
-
 from core.simulator import Simulator
 from core.channel import Channel
 from buoys.buoy import Buoy
@@ -10,7 +7,6 @@ import random
 import time
 import argparse
 import json
-import math
 
 def parse_args():
     cfg = ConfigHandler()
@@ -1,65 +1,60 @@
 import os
+import csv
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # plots are only ever saved to disk
 import matplotlib.pyplot as plt
 import numpy as np
-import re
-
-def plot_block_by_density(results_dir, plot_dir, interval=None):
+from concurrent.futures import ThreadPoolExecutor
+from result_files import INTERVAL_RE, SCALAR_CSV_OPTIONS, TIMESERIES_CSV_OPTIONS, scheduler_type
+
+def read_result_values(path):
+    """Map each metric in a Metric,Value result CSV to its raw string value"""
+    # Only a few scalars are needed per file, so skip building a DataFrame
+    with open(path, newline="") as csvfile:
+        rows = csv.reader(csvfile)
+        next(rows, None)
+        return {row[0]: row[1] for row in rows if len(row) > 1}
+
+def load_result_csvs(results_dir):
+    """Read every CSV in results_dir concurrently, returning (filename, values) pairs in listing order"""
     files = [f for f in os.listdir(results_dir) if f.endswith(".csv")]
+    with ThreadPoolExecutor() as executor:
+        values = executor.map(lambda f: read_result_values(os.path.join(results_dir, f)), files)
+        return list(zip(files, values))
+
+def plot_block_by_density(results_dir, plot_dir, interval=None, results=None):
     data = []
     collision_data = []
     avg_neighbors_data = {}
     multihop_modes = set()  # Track multihop modes
     
     # Extract data from CSV files
-    for f in files:
-        df = pd.read_csv(os.path.join(results_dir, f), index_col=0)
-        if "Density" in df.index and ("Delivery Ratio" in df.index or "B-PDR" in df.index):
-            density = float(df.loc["Density", "Value"])
-            pdr = float(df.loc["B-PDR", "Value"]) if "B-PDR" in df.index else float(df.loc["Delivery Ratio", "Value"])
+    if results is None:
+        results = load_result_csvs(results_dir)
+    for f, vals in results:
+        # Both plots are keyed by density and scheduler, so work them out once per file
+        if "Density" not in vals:
+            continue
+        density = float(vals["Density"])
+        sched_type = scheduler_type(f, vals) or "unknown"
+        
+        if "Delivery Ratio" in vals or "B-PDR" in vals:
+            pdr = float(vals["B-PDR"]) if "B-PDR" in vals else float(vals["Delivery Ratio"])
             
-            if "Average Neighbors" in df.index:
-                avg_neighbors = float(df.loc["Average Neighbors", "Value"])
+            if "Average Neighbors" in vals:
+                avg_neighbors = float(vals["Average Neighbors"])
                 avg_neighbors_data[density] = avg_neighbors
             
             # Extract multihop mode
-            if "Multihop Mode" in df.index:
-                mode = str(df.loc["Multihop Mode", "Value"]).lower()
+            if "Multihop Mode" in vals:
+                mode = str(vals["Multihop Mode"]).lower()
                 multihop_modes.add(mode)
-            
-            # Determine scheduler type
-            if "Scheduler Type" in df.index:
-                sched_type = str(df.loc["Scheduler Type", "Value"]).lower()
-            elif f.startswith("static_"):
-                sched_type = "static"
-            elif f.startswith("dynamic_acab_"):
-                sched_type = "dynamic_acab"
-            elif f.startswith("dynamic_adab_"):
-                sched_type = "dynamic_adab"
-            elif f.startswith("dynamic_"):
-                sched_type = "dynamic_adab"
-            else:
-                sched_type = "unknown"
                 
             data.append((density, pdr, sched_type))
             
-        if "Density" in df.index and "Collision Rate" in df.index:
-            density = float(df.loc["Density", "Value"])
-            collision_rate = float(df.loc["Collision Rate", "Value"])
-            
-            if "Scheduler Type" in df.index:
-                sched_type = str(df.loc["Scheduler Type", "Value"]).lower()
-            elif f.startswith("static_"):
-                sched_type = "static"
-            elif f.startswith("dynamic_acab_"):
-                sched_type = "dynamic_acab"
-            elif f.startswith("dynamic_adab_"):
-                sched_type = "dynamic_adab"
-            elif f.startswith("dynamic_"):
-                sched_type = "dynamic_adab"
-            else:
-                sched_type = "unknown"
-                
+        if "Collision Rate" in vals:
+            collision_rate = float(vals["Collision Rate"])
             collision_data.append((density, collision_rate, sched_type))
     
     if not data:
@@ -84,9 +79,11 @@ def plot_block_by_density(results_dir, plot_dir, interval=None):
     
     # Create B-PDR by density plot
     df = pd.DataFrame(data, columns=["Density", "B-PDR", "Scheduler"])
-    grouped = df.groupby(["Density", "Scheduler"]).mean().reset_index()
     densities = sorted(df["Density"].unique())
     schedulers = ["dynamic_acab", "dynamic_adab", "static"]
+    # Density x scheduler table of mean B-PDR; missing cells plot as 0
+    pdr_table = df.pivot_table(index="Density", columns="Scheduler", values="B-PDR", aggfunc="mean")
+    pdr_table = pdr_table.reindex(index=densities, columns=schedulers).fillna(0)
     scheduler_labels = {"static": "SBP", "dynamic_adab": "ADAB", "dynamic_acab": "ACAB"}
     color_map = {"static": "tab:blue", "dynamic_adab": "tab:orange", "dynamic_acab": "tab:green"}
     bar_width = 0.25
@@ -101,11 +98,7 @@ def plot_block_by_density(results_dir, plot_dir, interval=None):
     
     offset = -(len(schedulers) - 1) * bar_width / 2
     for i, sched in enumerate(schedulers):
-        pdrs = []
-        for d in densities:
-            row = grouped[(grouped["Density"] == d) & (grouped["Scheduler"] == sched)]
-            pdrs.append(row["B-PDR"].values[0] if not row.empty else 0)
-        ax.bar(x + offset + i * bar_width, pdrs, bar_width, label=scheduler_labels[sched], color=color_map[sched])
+        ax.bar(x + offset + i * bar_width, pdr_table[sched].to_numpy(), bar_width, label=scheduler_labels[sched], color=color_map[sched])
     
     # Plot average neighbors as a connected line across all densities
     if avg_neighbors_data:
@@ -174,17 +167,14 @@ def plot_block_by_density(results_dir, plot_dir, interval=None):
     
     # Create collision rate by density plot
     coll_df = pd.DataFrame(collision_data, columns=["Density", "CollisionRate", "Scheduler"])
-    grouped_coll = coll_df.groupby(["Density", "Scheduler"]).mean().reset_index()
     densities = sorted(coll_df["Density"].unique())
+    rate_table = coll_df.pivot_table(index="Density", columns="Scheduler", values="CollisionRate", aggfunc="mean")
+    rate_table = rate_table.reindex(index=densities, columns=schedulers).fillna(0)
     
     fig, ax = plt.subplots(figsize=(10, 6))
     offset = -(len(schedulers) - 1) * bar_width / 2
     for i, sched in enumerate(schedulers):
-        rates = []
-        for d in densities:
-            row = grouped_coll[(grouped_coll["Density"] == d) & (grouped_coll["Scheduler"] == sched)]
-            rates.append(row["CollisionRate"].values[0] if not row.empty else 0)
-        ax.bar(x + offset + i * bar_width, rates, bar_width, label=scheduler_labels[sched], color=color_map[sched])
+        ax.bar(x + offset + i * bar_width, rate_table[sched].to_numpy(), bar_width, label=scheduler_labels[sched], color=color_map[sched])
     
     ax.set_xlabel("Total Buoys")
     ax.set_ylabel("Collision Rate")
@@ -224,7 +214,7 @@ def plot_ramp_grouped_by_buoy_count(results_dir, plot_file):
     for mode, _ in modes:
         csv_file = os.path.join(results_dir, f"{mode}_ramp_timeseries.csv")
         if os.path.exists(csv_file):
-            df = pd.read_csv(csv_file)
+            df = pd.read_csv(csv_file, **TIMESERIES_CSV_OPTIONS)
             if "n_buoys" in df.columns:
                 min_buoys = min(min_buoys, df["n_buoys"].min())
                 max_buoys = max(max_buoys, df["n_buoys"].max())
@@ -233,7 +223,7 @@ def plot_ramp_grouped_by_buoy_count(results_dir, plot_file):
             # Try to get multihop mode from main CSV (not timeseries)
             main_csv = csv_file.replace("_timeseries.csv", ".csv")
             if multihop_mode is None and os.path.exists(main_csv):
-                main_df = pd.read_csv(main_csv, index_col=0)
+                main_df = pd.read_csv(main_csv, usecols=[0, 1], **SCALAR_CSV_OPTIONS)
                 if "Multihop Mode" in main_df.index:
                     multihop_mode = str(main_df.loc["Multihop Mode", "Value"]).lower()
     
@@ -322,7 +312,7 @@ def plot_ramp_grouped_by_buoy_count(results_dir, plot_file):
     plt.close()
 
 def extract_interval_from_dirname(dirname):
-    match = re.search(r'interval(\d+(?:_\d+)?)', dirname)
+    match = INTERVAL_RE.search(dirname)
     if match:
         interval_str = match.group(1).replace('_', '.')
         try:
@@ -351,7 +341,7 @@ def plot_delivery_ratio_vs_time(results_dir, plot_file, interval=None):
     for mode, color in modes:
         csv_file = os.path.join(results_dir, f"{mode}_ramp_timeseries.csv")
         if os.path.exists(csv_file):
-            df = pd.read_csv(csv_file)
+            df = pd.read_csv(csv_file, **TIMESERIES_CSV_OPTIONS)
             if "B-PDR" in df.columns:
                 y_col = "B-PDR"
             elif "delivery_ratio" in df.columns:
@@ -373,7 +363,7 @@ def plot_delivery_ratio_vs_time(results_dir, plot_file, interval=None):
             # Try to get multihop mode from main CSV
             main_csv = csv_file.replace("_timeseries.csv", ".csv")
             if multihop_mode is None and os.path.exists(main_csv):
-                main_df = pd.read_csv(main_csv, index_col=0)
+                main_df = pd.read_csv(main_csv, usecols=[0, 1], **SCALAR_CSV_OPTIONS)
                 if "Multihop Mode" in main_df.index:
                     multihop_mode = str(main_df.loc["Multihop Mode", "Value"]).lower()
 
@@ -434,35 +424,24 @@ def plot_delivery_ratio_vs_time(results_dir, plot_file, interval=None):
     plt.savefig(plot_file)
     plt.close()
 
-def plot_unique_nodes_by_density(results_dir, plot_dir, interval=None):
+def plot_unique_nodes_by_density(results_dir, plot_dir, interval=None, results=None):
     """Plot average unique nodes discovered vs density for different schedulers"""
-    files = [f for f in os.listdir(results_dir) if f.endswith(".csv")]
     data = []
     
-    for f in files:
-        df = pd.read_csv(os.path.join(results_dir, f), index_col=0)
-        if "Density" in df.index and "Avg Unique Nodes Discovered" in df.index:
-            density = float(df.loc["Density", "Value"])
-            avg_unique = float(df.loc["Avg Unique Nodes Discovered", "Value"])
+    if results is None:
+        results = load_result_csvs(results_dir)
+    for f, vals in results:
+        if "Density" in vals and "Avg Unique Nodes Discovered" in vals:
+            density = float(vals["Density"])
+            avg_unique = float(vals["Avg Unique Nodes Discovered"])
             
-            avg_neighbors = float(df.loc["Average Neighbors", "Value"]) if "Average Neighbors" in df.index else 0
+            avg_neighbors = float(vals["Average Neighbors"]) if "Average Neighbors" in vals else 0
             
-            if "Scheduler Type" in df.index:
-                sched_type = str(df.loc["Scheduler Type", "Value"]).lower()
-            elif f.startswith("static_"):
-                sched_type = "static"
-            elif f.startswith("dynamic_acab_"):
-                sched_type = "dynamic_acab"
-            elif f.startswith("dynamic_adab_"):
-                sched_type = "dynamic_adab"
-            elif f.startswith("dynamic_"):
-                sched_type = "dynamic_adab"
-            else:
-                sched_type = "unknown"
+            sched_type = scheduler_type(f, vals) or "unknown"
             
             multihop_mode = "none"
-            if "Multihop Mode" in df.index:
-                multihop_mode = str(df.loc["Multihop Mode", "Value"]).lower()
+            if "Multihop Mode" in vals:
+                multihop_mode = str(vals["Multihop Mode"]).lower()
                 
             data.append((density, avg_unique, avg_neighbors, sched_type, multihop_mode))
     
@@ -476,10 +455,11 @@ def plot_unique_nodes_by_density(results_dir, plot_dir, interval=None):
     # density - 1 because we exclude self from potential discoveries
     df["PercentageDiscovered"] = (df["AvgUniqueNodes"] / (df["Density"] - 1)) * 100
     
-    grouped = df.groupby(["Density", "Scheduler", "MultihopMode"]).mean().reset_index()
-    
     densities = sorted(df["Density"].unique())
     schedulers = ["dynamic_acab", "dynamic_adab", "static"]
+    # (mode, density) x scheduler table of mean discovery; missing cells plot as 0
+    percent_table = df.pivot_table(index=["MultihopMode", "Density"], columns="Scheduler",
+                                   values="PercentageDiscovered", aggfunc="mean")
     scheduler_labels = {"static": "SBP", "dynamic_adab": "ADAB", "dynamic_acab": "ACAB"}
     color_map = {"static": "tab:blue", "dynamic_adab": "tab:orange", "dynamic_acab": "tab:green"}
     
@@ -491,17 +471,13 @@ def plot_unique_nodes_by_density(results_dir, plot_dir, interval=None):
             axes = [axes]
         
         for ax, mode in zip(axes, multihop_modes):
-            mode_data = grouped[grouped["MultihopMode"] == mode]
+            mode_table = percent_table.loc[mode].reindex(index=densities, columns=schedulers).fillna(0)
             bar_width = 0.25
             x = np.arange(len(densities))
             
             offset = -(len(schedulers) - 1) * bar_width / 2
             for i, sched in enumerate(schedulers):
-                values = []
-                for d in densities:
-                    row = mode_data[(mode_data["Density"] == d) & (mode_data["Scheduler"] == sched)]
-                    values.append(row["PercentageDiscovered"].values[0] if not row.empty else 0)  # UPDATED
-                ax.bar(x + offset + i * bar_width, values, bar_width, 
+                ax.bar(x + offset + i * bar_width, mode_table[sched].to_numpy(), bar_width, 
                       label=scheduler_labels[sched], color=color_map[sched])
             
             ax.set_xlabel("Total Buoys")
@@ -524,14 +500,11 @@ def plot_unique_nodes_by_density(results_dir, plot_dir, interval=None):
         fig, ax = plt.subplots(figsize=(10, 6))
         bar_width = 0.25
         x = np.arange(len(densities))
+        mode_table = percent_table.loc[multihop_modes[0]].reindex(index=densities, columns=schedulers).fillna(0)
         
         offset = -(len(schedulers) - 1) * bar_width / 2
         for i, sched in enumerate(schedulers):
-            values = []
-            for d in densities:
-                row = grouped[(grouped["Density"] == d) & (grouped["Scheduler"] == sched)]
-                values.append(row["PercentageDiscovered"].values[0] if not row.empty else 0)  # UPDATED
-            ax.bar(x + offset + i * bar_width, values, bar_width, 
+            ax.bar(x + offset + i * bar_width, mode_table[sched].to_numpy(), bar_width, 
                   label=scheduler_labels[sched], color=color_map[sched])
         
         ax.set_xlabel("Total Buoys")
@@ -574,7 +547,7 @@ def plot_unique_nodes_vs_time(results_dir, plot_file, interval=None):
     for mode, color in modes:
         csv_file = os.path.join(results_dir, f"{mode}_ramp_timeseries.csv")
         if os.path.exists(csv_file):
-            df = pd.read_csv(csv_file)
+            df = pd.read_csv(csv_file, **TIMESERIES_CSV_OPTIONS)
             if "avg_unique_nodes" in df.columns:
                 label = mode_labels.get(mode, mode.capitalize())
                 plt.plot(df["time"], df["avg_unique_nodes"], label=label, color=color)
@@ -587,7 +560,7 @@ def plot_unique_nodes_vs_time(results_dir, plot_file, interval=None):
             # Try to get multihop mode from main CSV
             main_csv = csv_file.replace("_timeseries.csv", ".csv")
             if multihop_mode is None and os.path.exists(main_csv):
-                main_df = pd.read_csv(main_csv, index_col=0)
+                main_df = pd.read_csv(main_csv, usecols=[0, 1], **SCALAR_CSV_OPTIONS)
                 if "Multihop Mode" in main_df.index:
                     multihop_mode = str(main_df.loc["Multihop Mode", "Value"]).lower()
 
@@ -662,11 +635,14 @@ def main():
     if not os.path.exists(plot_dir):
         os.makedirs(plot_dir, exist_ok=True)
 
+    # Both density plots read the same files, so parse them once here
+    results = load_result_csvs(results_dir)
+
     print("Plotting standard metrics...")
-    plot_block_by_density(results_dir, plot_dir, interval=interval)
+    plot_block_by_density(results_dir, plot_dir, interval=interval, results=results)
 
     print("Plotting unique nodes by density...")
-    plot_unique_nodes_by_density(results_dir, plot_dir, interval=interval)
+    plot_unique_nodes_by_density(results_dir, plot_dir, interval=interval, results=results)
 
     print("Plotting B-PDR vs time for ramp scenarios...")
     plot_file = os.path.join(plot_dir, "b_pdr_vs_time_ramp.png")
@@ -1,48 +1,27 @@
 import os
+import csv
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # plots are only ever saved to disk
 import matplotlib.pyplot as plt
 import numpy as np
-import re
 import glob
+from result_files import SCALAR_CSV_OPTIONS, extract_interval_from_dirname, read_csvs, scheduler_type
 
 def extract_interval_from_csv(csv_file):
     """Extract static interval from a CSV file"""
+    # Only one row is needed, so scan the raw rows instead of building a DataFrame
     try:
-        df = pd.read_csv(csv_file, index_col=0)
-        if "Static Interval" in df.index:
-            interval_value = df.loc["Static Interval", "Value"]
-            if interval_value != "N/A":
-                return float(interval_value)
+        with open(csv_file, newline="") as fh:
+            for row in csv.reader(fh):
+                if row and row[0] == "Static Interval":
+                    if len(row) > 1 and row[1] != "N/A":
+                        return float(row[1])
+                    break
     except Exception as e:
         print(f"Warning: Could not extract interval from {csv_file}: {e}")
     return None
 
-def extract_interval_from_dirname(dirname):
-    """
-    Hard-coded interval mapping based on directory naming convention.
-    interval1_ideal -> 1.0s
-    interval2_5_ideal -> 0.25s  
-    interval5_ideal -> 0.5s
-    """
-    # Hard-coded mappings
-    if 'interval1' in dirname:
-        return 1.0
-    elif 'interval2_5' in dirname or 'interval2.5' in dirname:
-        return 0.25
-    elif 'interval5' in dirname:
-        return 0.5
-    
-    # Fallback: try to parse from dirname if it doesn't match known patterns
-    match = re.search(r'interval(\d+(?:_\d+)?)', dirname)
-    if match:
-        interval_str = match.group(1).replace('_', '.')
-        try:
-            return float(interval_str)
-        except ValueError:
-            return None
-    
-    return None
-
 def find_common_intervals(base_dirs):
     """
     Find intervals that exist in all three mode directories.
@@ -125,26 +104,25 @@ def get_density_dataframes_by_mode(base_dirs, interval_suffix):
         
         files = glob.glob(os.path.join(results_dir, "*_density*.csv"))
         
-        for f in files:
-            df = pd.read_csv(f, index_col=0)
+        for f, df in zip(files, read_csvs(files, **SCALAR_CSV_OPTIONS)):
+            # Plain dicts keep the per-metric lookups below off the pandas indexer
+            vals = df["Value"].to_dict()
+            stds = df["StdDev"].to_dict()
             
             # Determine scheduler type
-            if "Scheduler Type" in df.index:
-                sched_type = str(df.loc["Scheduler Type", "Value"]).lower()
-            elif os.path.basename(f).startswith("static_"):
-                sched_type = "static"
-            elif os.path.basename(f).startswith("dynamic_acab_"):
-                sched_type = "dynamic_acab"
-            elif os.path.basename(f).startswith("dynamic_adab_"):
-                sched_type = "dynamic_adab"
-            else:
+            sched_type = scheduler_type(f, vals)
+            if sched_type is None:
+                continue
+            
+            # Every row below is keyed by density, so convert it once per file
+            if "Density" not in vals:
                 continue
+            density = float(vals["Density"])
             
             # Extract B-PDR data
-            if "Density" in df.index and ("Delivery Ratio" in df.index or "B-PDR" in df.index):
-                density = float(df.loc["Density", "Value"])
-                pdr = float(df.loc["B-PDR", "Value"]) if "B-PDR" in df.index else float(df.loc["Delivery Ratio", "Value"])
-                pdr_std = float(df.loc["B-PDR", "StdDev"]) if "B-PDR" in df.index else float(df.loc["Delivery Ratio", "StdDev"])
+            if "Delivery Ratio" in vals or "B-PDR" in vals:
+                pdr = float(vals["B-PDR"]) if "B-PDR" in vals else float(vals["Delivery Ratio"])
+                pdr_std = float(stds["B-PDR"]) if "B-PDR" in vals else float(stds["Delivery Ratio"])
                 
                 all_data.append({
                     'Density': density,
@@ -155,10 +133,9 @@ def get_density_dataframes_by_mode(base_dirs, interval_suffix):
                 })
             
             # Extract collision rate data
-            if "Density" in df.index and "Collision Rate" in df.index:
-                density = float(df.loc["Density", "Value"])
-                collision_rate = float(df.loc["Collision Rate", "Value"])
-                collision_std = float(df.loc["Collision Rate", "StdDev"])
+            if "Collision Rate" in vals:
+                collision_rate = float(vals["Collision Rate"])
+                collision_std = float(stds["Collision Rate"])
                 
                 all_data.append({
                     'Density': density,
@@ -169,10 +146,9 @@ def get_density_dataframes_by_mode(base_dirs, interval_suffix):
                 })
             
             # Extract unique nodes data
-            if "Density" in df.index and "Avg Unique Nodes Discovered" in df.index:
-                density = float(df.loc["Density", "Value"])
-                avg_unique = float(df.loc["Avg Unique Nodes Discovered", "Value"])
-                avg_unique_std = float(df.loc["Avg Unique Nodes Discovered", "StdDev"])
+            if "Avg Unique Nodes Discovered" in vals:
+                avg_unique = float(vals["Avg Unique Nodes Discovered"])
+                avg_unique_std = float(stds["Avg Unique Nodes Discovered"])
                 
                 # Calculate percentage
                 percentage = (avg_unique / (density - 1)) * 100 if density > 1 else 0
@@ -190,11 +166,12 @@ def get_density_dataframes_by_mode(base_dirs, interval_suffix):
     
     return pd.DataFrame(all_data)
 
-def plot_bpdr_by_mode_comparison(base_dirs, output_dir, interval, interval_suffix):
+def plot_bpdr_by_mode_comparison(base_dirs, output_dir, interval, interval_suffix, df=None):
     """
     Plot B-PDR comparison for each scheduler, comparing the three modes
     """
-    df = get_density_dataframes_by_mode(base_dirs, interval_suffix)
+    if df is None:
+        df = get_density_dataframes_by_mode(base_dirs, interval_suffix)
     
     if df.empty or 'B-PDR' not in df.columns:
         print("  ⚠ No B-PDR data found")
@@ -216,24 +193,16 @@ def plot_bpdr_by_mode_comparison(base_dirs, output_dir, interval, interval_suffi
     bar_width = 0.25
     x = np.arange(len(densities))
     
+    # One groupby over all three keys; missing cells plot as 0
+    cell_means = pdr_df.groupby(["Scheduler", "MultihopMode", "Density"])[["B-PDR", "StdDev"]].mean()
+    
     for ax, sched in zip(axes, schedulers):
         offset = -(len(modes) - 1) * bar_width / 2
         
         for i, mode in enumerate(modes):
-            values = []
-            errors = []
-            
-            for d in densities:
-                rows = pdr_df[(pdr_df["Density"] == d) & 
-                             (pdr_df["Scheduler"] == sched) & 
-                             (pdr_df["MultihopMode"] == mode)]
-                
-                if not rows.empty:
-                    values.append(rows["B-PDR"].mean())
-                    errors.append(rows["StdDev"].mean())
-                else:
-                    values.append(0)
-                    errors.append(0)
+            cells = cell_means.reindex(pd.MultiIndex.from_product([[sched], [mode], densities]), fill_value=0)
+            values = cells["B-PDR"].to_numpy()
+            errors = cells["StdDev"].to_numpy()
             
             ax.bar(x + offset + i * bar_width, values, bar_width, 
                    label=mode_labels[mode], color=mode_colors[mode])
@@ -260,11 +229,12 @@ def plot_bpdr_by_mode_comparison(base_dirs, output_dir, interval, interval_suffi
     plt.close()
     print(f"  ✓ Saved {filename}")
 
-def plot_collision_by_mode_comparison(base_dirs, output_dir, interval, interval_suffix):
+def plot_collision_by_mode_comparison(base_dirs, output_dir, interval, interval_suffix, df=None):
     """
     Plot collision rate comparison for each scheduler, comparing the three modes
     """
-    df = get_density_dataframes_by_mode(base_dirs, interval_suffix)
+    if df is None:
+        df = get_density_dataframes_by_mode(base_dirs, interval_suffix)
     
     if df.empty or 'CollisionRate' not in df.columns:
         print("  ⚠ No collision rate data found")
@@ -286,24 +256,16 @@ def plot_collision_by_mode_comparison(base_dirs, output_dir, interval, interval_
     bar_width = 0.25
     x = np.arange(len(densities))
     
+    # One groupby over all three keys; missing cells plot as 0
+    cell_means = coll_df.groupby(["Scheduler", "MultihopMode", "Density"])[["CollisionRate", "CollisionStdDev"]].mean()
+    
     for ax, sched in zip(axes, schedulers):
         offset = -(len(modes) - 1) * bar_width / 2
         
         for i, mode in enumerate(modes):
-            values = []
-            errors = []
-            
-            for d in densities:
-                rows = coll_df[(coll_df["Density"] == d) & 
-                              (coll_df["Scheduler"] == sched) & 
-                              (coll_df["MultihopMode"] == mode)]
-                
-                if not rows.empty:
-                    values.append(rows["CollisionRate"].mean())
-                    errors.append(rows["CollisionStdDev"].mean())
-                else:
-                    values.append(0)
-                    errors.append(0)
+            cells = cell_means.reindex(pd.MultiIndex.from_product([[sched], [mode], densities]), fill_value=0)
+            values = cells["CollisionRate"].to_numpy()
+            errors = cells["CollisionStdDev"].to_numpy()
             
             ax.bar(x + offset + i * bar_width, values, bar_width, 
                    label=mode_labels[mode], color=mode_colors[mode])
@@ -330,11 +292,12 @@ def plot_collision_by_mode_comparison(base_dirs, output_dir, interval, interval_
     plt.close()
     print(f"  ✓ Saved {filename}")
 
-def plot_unique_nodes_by_mode_comparison(base_dirs, output_dir, interval, interval_suffix):
+def plot_unique_nodes_by_mode_comparison(base_dirs, output_dir, interval, interval_suffix, df=None):
     """
     Plot unique nodes (as percentage) comparison for each scheduler, comparing the three modes
     """
-    df = get_density_dataframes_by_mode(base_dirs, interval_suffix)
+    if df is None:
+        df = get_density_dataframes_by_mode(base_dirs, interval_suffix)
     
     if df.empty or 'PercentageDiscovered' not in df.columns:
         print("  ⚠ No unique nodes data found")
@@ -356,24 +319,16 @@ def plot_unique_nodes_by_mode_comparison(base_dirs, output_dir, interval, interv
     bar_width = 0.25
     x = np.arange(len(densities))
     
+    # One groupby over all three keys; missing cells plot as 0
+    cell_means = unique_df.groupby(["Scheduler", "MultihopMode", "Density"])[["PercentageDiscovered", "PercentageStdDev"]].mean()
+    
     for ax, sched in zip(axes, schedulers):
         offset = -(len(modes) - 1) * bar_width / 2
         
         for i, mode in enumerate(modes):
-            values = []
-            errors = []
-            
-            for d in densities:
-                rows = unique_df[(unique_df["Density"] == d) & 
-                                (unique_df["Scheduler"] == sched) & 
-                                (unique_df["MultihopMode"] == mode)]
-                
-                if not rows.empty:
-                    values.append(rows["PercentageDiscovered"].mean())
-                    errors.append(rows["PercentageStdDev"].mean())
-                else:
-                    values.append(0)
-                    errors.append(0)
+            cells = cell_means.reindex(pd.MultiIndex.from_product([[sched], [mode], densities]), fill_value=0)
+            values = cells["PercentageDiscovered"].to_numpy()
+            errors = cells["PercentageStdDev"].to_numpy()
             
             ax.bar(x + offset + i * bar_width, values, bar_width, 
                    label=mode_labels[mode], color=mode_colors[mode])
@@ -451,9 +406,12 @@ def main():
         
         print(f"Processing interval {interval_value}s ({interval_suffix})...")
         
-        plot_bpdr_by_mode_comparison(base_dirs, args.output_dir, interval_value, interval_suffix)
-        plot_collision_by_mode_comparison(base_dirs, args.output_dir, interval_value, interval_suffix)
-        plot_unique_nodes_by_mode_comparison(base_dirs, args.output_dir, interval_value, interval_suffix)
+        # The three comparisons share one parse of this interval's results
+        df = get_density_dataframes_by_mode(base_dirs, interval_suffix)
+        
+        plot_bpdr_by_mode_comparison(base_dirs, args.output_dir, interval_value, interval_suffix, df=df)
+        plot_collision_by_mode_comparison(base_dirs, args.output_dir, interval_value, interval_suffix, df=df)
+        plot_unique_nodes_by_mode_comparison(base_dirs, args.output_dir, interval_value, interval_suffix, df=df)
         
         print()
     
@@ -0,0 +1,63 @@
+import os
+import re
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+# Directory-name patterns, compiled once at import
+INTERVAL_RE = re.compile(r'interval(\d+(?:_\d+)?)')
+
+# Metric/Value result files: keep every value as its raw string and let callers convert
+# only what they use, skipping pandas' type and NA inference
+SCALAR_CSV_OPTIONS = {"index_col": 0, "dtype": str, "na_filter": False, "memory_map": True}
+
+# Ramp timeseries files are all-numeric tables: map them in and infer each column in one pass
+TIMESERIES_CSV_OPTIONS = {"engine": "c", "memory_map": True, "low_memory": False}
+
+# Filename prefixes for result files that predate the Scheduler Type row, most specific first
+SCHEDULER_PREFIXES = (
+    ("static_", "static"),
+    ("dynamic_acab_", "dynamic_acab"),
+    ("dynamic_adab_", "dynamic_adab"),
+    ("dynamic_", "dynamic_adab"),
+)
+
+def read_csvs(files, **kwargs):
+    """Read the given CSVs concurrently, returning DataFrames in the same order"""
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(lambda f: pd.read_csv(f, **kwargs), files))
+
+def scheduler_type(filename, vals):
+    """Scheduler of a result file: its Scheduler Type value, else inferred from the filename, else None"""
+    if "Scheduler Type" in vals:
+        return str(vals["Scheduler Type"]).lower()
+    name = os.path.basename(filename)
+    for prefix, sched_type in SCHEDULER_PREFIXES:
+        if name.startswith(prefix):
+            return sched_type
+    return None
+
+def extract_interval_from_dirname(dirname):
+    """
+    Hard-coded interval mapping based on directory naming convention.
+    interval1_ideal -> 1.0s
+    interval2_5_ideal -> 0.25s
+    interval5_ideal -> 0.5s
+    """
+    # Hard-coded mappings
+    if 'interval1' in dirname:
+        return 1.0
+    elif 'interval2_5' in dirname or 'interval2.5' in dirname:
+        return 0.25
+    elif 'interval5' in dirname:
+        return 0.5
+
+    # Fallback: try to parse from dirname if it doesn't match known patterns
+    match = INTERVAL_RE.search(dirname)
+    if match:
+        interval_str = match.group(1).replace('_', '.')
+        try:
+            return float(interval_str)
+        except ValueError:
+            return None
+
+    return None
@@ -16,9 +16,21 @@ COLORS = {
 # Default log file path, root of the project
 LOG_FILE = Path("simulator.log")
 
-def _log(level: str, message: str, to_console: bool = True, to_file: bool = False):
-    if not ConfigHandler().get('simulation', 'enable_logging'):
+_enabled = None
+
+def is_enabled() -> bool:
+    # The config never changes after load, so the flag is read once
+    global _enabled
+    if _enabled is None:
+        _enabled = bool(ConfigHandler().get('simulation', 'enable_logging'))
+    return _enabled
+
+def _log(level: str, message: str, args: tuple = (), to_console: bool = True, to_file: bool = False):
+    if not is_enabled():
         return
+    # %-style args are only formatted once we know the line is emitted
+    if args:
+        message = message % args
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     color = COLORS.get(level, '')
     reset = COLORS['RESET']
@@ -35,8 +47,8 @@ def _log(level: str, message: str, to_console: bool = True, to_file: bool = Fals
         with LOG_FILE.open("a") as f:
             f.write(formatted + "\n")
 
-def log_info(msg: str, to_console: bool = True, to_file: bool = False): _log("INFO", msg, to_console, to_file)
-def log_debug(msg: str, to_console: bool = True, to_file: bool = False): _log("DEBUG", msg, to_console, to_file)
-def log_warning(msg: str, to_console: bool = True, to_file: bool = False): _log("WARNING", msg, to_console, to_file)
-def log_error(msg: str, to_console: bool = True, to_file: bool = False): _log("ERROR", msg, to_console, to_file)
-def log_critical(msg: str, to_console: bool = True, to_file: bool = False): _log("CRITICAL", msg, to_console, to_file)
\ No newline at end of file
+def log_info(msg: str, *args, to_console: bool = True, to_file: bool = False): _log("INFO", msg, args, to_console, to_file)
+def log_debug(msg: str, *args, to_console: bool = True, to_file: bool = False): _log("DEBUG", msg, args, to_console, to_file)
+def log_warning(msg: str, *args, to_console: bool = True, to_file: bool = False): _log("WARNING", msg, args, to_console, to_file)
+def log_error(msg: str, *args, to_console: bool = True, to_file: bool = False): _log("ERROR", msg, args, to_console, to_file)
+def log_critical(msg: str, *args, to_console: bool = True, to_file: bool = False): _log("CRITICAL", msg, args, to_console, to_file)
\ No newline at end of file
@@ -184,7 +184,7 @@ class Metrics:
             writer.writerow(["Metric", "Value"])
             for key, value in summary.items():
                 writer.writerow([key, value])
-        logging.log_info(f"Metrics exported to {filepath}")
+        logging.log_info("Metrics exported to %s", filepath)
 
     def export_time_series(self, filename=None):
         import pandas as pd
@@ -203,7 +203,7 @@ class Metrics:
 
         df = pd.DataFrame(self.time_series)
         df.to_csv(filepath, index=False)
-        logging.log_info(f"Time series exported to {filepath}")
+        logging.log_info("Time series exported to %s", filepath)
 
     def set_avg_neighbors(self, avg_neighbors):
         self.avg_neighbors = avg_neighbors
\ No newline at end of file